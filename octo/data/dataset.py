@@ -1,5 +1,6 @@
 from functools import partial
 import json
+import os
 from typing import Callable, Mapping, Optional, Sequence, Tuple, Union
 
 from absl import logging
@@ -391,7 +392,9 @@ def make_dataset_from_rlds(
             full_dataset = full_dataset.filter(ModuleSpec.instantiate(filter_fcn_spec))
         if ignore_errors:
             full_dataset = full_dataset.ignore_errors()
-        full_dataset = full_dataset.traj_map(restructure).filter(is_nonzero_length)
+        full_dataset = full_dataset.traj_map(
+            restructure, tf.data.AUTOTUNE
+        ).filter(is_nonzero_length)
         # tries to load from cache, otherwise computes on the fly
         dataset_statistics = get_dataset_statistics(
             full_dataset,
@@ -497,6 +500,7 @@ def make_interleaved_dataset(
     balance_weights: bool = False,
     traj_transform_threads: Optional[int] = None,
     traj_read_threads: Optional[int] = None,
+    cache_dir: Optional[str] = None,
 ) -> dl.DLataset:
     """Creates an interleaved dataset from list of dataset kwargs. Returns a dataset of batched frames.
 
@@ -519,6 +523,10 @@ def make_interleaved_dataset(
             datasets according to their sampling weights. If None, defaults to AUTOTUNE for every dataset.
         traj_read_threads: total number of parallel read workers for trajectory transforms, distributed across
             datasets according to their sampling weights. If None, defaults to AUTOTUNE for every dataset.
+        cache_dir: if provided, each dataset's loaded (still image-encoded) trajectories are cached here,
+            so every epoch after the first reads from local storage instead of the source (e.g. GCS). Pass ""
+            to cache in memory. The cache sits before repeating, shuffling, and augmentation, so randomness
+            is unaffected. Only use this if the datasets fit in the cache location.
     """
     # default to uniform sampling
     if not sample_weights:
@@ -566,6 +574,14 @@ def make_interleaved_dataset(
             num_parallel_reads=reads,
             dataset_statistics=all_dataset_statistics[dataset_kwargs["name"]],
         )
+        if cache_dir is not None:
+            # cache must come before repeating (it would grow unboundedly on an
+            # infinite stream) and before any randomized transforms
+            dataset = dataset.cache(
+                ""
+                if cache_dir == ""
+                else os.path.join(cache_dir, dataset_kwargs["name"].replace(":", "_"))
+            )
         dataset = apply_trajectory_transforms(
             dataset.repeat(),
             **traj_transform_kwargs,
@@ -591,6 +607,17 @@ def make_interleaved_dataset(
 
     dataset = dataset.ignore_errors(log_warning=True)
 
+    # enable static tf.data graph optimizations and autotuned buffer sizing; during
+    # training the element order is already randomized by sampling and shuffling, so
+    # also allow nondeterministic ordering to avoid stalling on straggler shards
+    options = tf.data.Options()
+    options.autotune.enabled = True
+    options.experimental_optimization.map_fusion = True
+    options.experimental_optimization.map_and_batch_fusion = True
+    if train:
+        options.deterministic = False
+    dataset = dataset.with_options(options)
+
     # save for later
     dataset.dataset_statistics = all_dataset_statistics
     dataset.sample_weights = sample_weights
@@ -105,22 +105,23 @@ def decode_and_resize(
     depth_resize_size: Union[Tuple[int, int], Mapping[str, Tuple[int, int]]],
 ) -> dict:
     """Decodes images and depth images, and then optionally resizes them."""
-    # just gets the part after "image_" or "depth_"
-    image_names = {key[6:] for key in obs if key.startswith("image_")}
-    depth_names = {key[6:] for key in obs if key.startswith("depth_")}
+    # collect the matching keys once; "name" is the part after "image_" or "depth_"
+    image_keys = [key for key in obs if key.startswith("image_")]
+    depth_keys = [key for key in obs if key.startswith("depth_")]
 
     if isinstance(resize_size, tuple):
-        resize_size = {name: resize_size for name in image_names}
+        resize_size = {key[6:]: resize_size for key in image_keys}
     if isinstance(depth_resize_size, tuple):
-        depth_resize_size = {name: depth_resize_size for name in depth_names}
+        depth_resize_size = {key[6:]: depth_resize_size for key in depth_keys}
 
-    for name in image_names:
+    for key in image_keys:
+        name = key[6:]
         if name not in resize_size:
             logging.warning(
                 f"No resize_size was provided for image_{name}. This will result in 1x1 "
                 "padding images, which may cause errors if you mix padding and non-padding images."
             )
-        image = obs[f"image_{name}"]
+        image = obs[key]
         if image.dtype == tf.string:
             if tf.strings.length(image) == 0:
                 # this is a padding image
@@ -135,15 +136,16 @@ def decode_and_resize(
             )
         if name in resize_size:
             image = dl.transforms.resize_image(image, size=resize_size[name])
-        obs[f"image_{name}"] = image
+        obs[key] = image
 
-    for name in depth_names:
+    for key in depth_keys:
+        name = key[6:]
         if name not in depth_resize_size:
             logging.warning(
                 f"No depth_resize_size was provided for depth_{name}. This will result in 1x1 "
                 "padding depth images, which may cause errors if you mix padding and non-padding images."
             )
-        depth = obs[f"depth_{name}"]
+        depth = obs[key]
         if depth.dtype == tf.string:
             if tf.strings.length(depth) == 0:
                 # this is a padding image
@@ -151,8 +153,11 @@ def decode_and_resize(
                     (*depth_resize_size.get(name, (1, 1)), 1), dtype=tf.float32
                 )
             else:
-                depth = tf.io.decode_image(
-                    depth, expand_animations=False, dtype=tf.float32
+                # depth images are single-channel PNGs: decode_png skips the generic
+                # format dispatch of decode_image, avoids decoding channels that the
+                # [..., 0] slice would discard, and yields a statically-known shape
+                depth = tf.image.convert_image_dtype(
+                    tf.io.decode_png(depth, channels=1, dtype=tf.uint16), tf.float32
                 )[..., 0]
         elif depth.dtype != tf.float32:
             raise ValueError(
@@ -162,6 +167,6 @@ def decode_and_resize(
             depth = dl.transforms.resize_depth_image(
                 depth, size=depth_resize_size[name]
             )
-        obs[f"depth_{name}"] = depth
+        obs[key] = depth
 
     return obs
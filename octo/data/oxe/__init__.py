@@ -1,4 +1,3 @@
-import copy
 import logging
 from typing import Any, Dict, List, Sequence, Tuple, Union
 
@@ -32,7 +31,10 @@ def make_oxe_dataset_kwargs(
         force_recompute_dataset_statistics: If True, recompute dataset statistics.
         action_proprio_normalization_type: Normalization type to use for proprioceptive actions.
     """
-    dataset_kwargs = copy.deepcopy(OXE_DATASET_CONFIGS[name])
+    # a shallow copy suffices: the mutations below either add/remove top-level keys or
+    # replace image_obs_keys/depth_obs_keys with freshly built dicts, so the global
+    # config (and its nested values) are never written through
+    dataset_kwargs = dict(OXE_DATASET_CONFIGS[name])
 
     if dataset_kwargs["action_encoding"] is ActionEncoding.EEF_POS:
         # with EEF_POS actions, the last action dimension is gripper
@@ -128,11 +130,11 @@ def make_oxe_dataset_kwargs_and_weights(
     if isinstance(data_mix, str):
         data_mix = OXE_NAMED_MIXES[data_mix]
 
-    filtered_datasets, included_dataset_names = [], []
+    filtered_datasets, included_dataset_names = [], set()
     for name, weight in data_mix:
         if name not in included_dataset_names:
             filtered_datasets.append((name, weight))
-            included_dataset_names.append(name)
+            included_dataset_names.add(name)
         else:
             logging.warning(f"Skipping duplicate: {(name, weight)}.")
     data_mix = filtered_datasets
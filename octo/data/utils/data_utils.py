@@ -64,18 +64,23 @@ def sample_match_keys_uniform(d: dict, key_template: str):
 def pprint_data_mixture(
     dataset_kwargs_list: List[Dict[str, Any]], dataset_weights: List[int]
 ) -> None:
-    print(
-        "\n######################################################################################"
-    )
-    print(
-        f"# Loading the following {len(dataset_kwargs_list)} datasets (incl. sampling weight):{'': >24} #"
-    )
-    for dataset_kwargs, weight in zip(dataset_kwargs_list, dataset_weights):
-        pad = 80 - len(dataset_kwargs["name"])
-        print(f"# {dataset_kwargs['name']}: {weight:=>{pad}f} #")
-    print(
-        "######################################################################################\n"
+    # build the full table once and issue a single print, so large mixes don't pay
+    # per-row i/o and distributed launches don't interleave partially written tables
+    border = "#" * 86
+    rows = [
+        "\n" + border,
+        f"# Loading the following {len(dataset_kwargs_list)} datasets (incl. sampling weight):{'': >24} #",
+    ]
+    rows.extend(
+        "# {name}: {weight:=>{pad}f} #".format(
+            name=dataset_kwargs["name"],
+            weight=weight,
+            pad=80 - len(dataset_kwargs["name"]),
+        )
+        for dataset_kwargs, weight in zip(dataset_kwargs_list, dataset_weights)
     )
+    rows.append(border + "\n")
+    print("\n".join(rows))
 
 
 def get_dataset_statistics(
@@ -129,7 +134,8 @@ def get_dataset_statistics(
                 if "proprio" in traj["observation"]
                 else {}
             ),
-        }
+        },
+        tf.data.AUTOTUNE,
     )
 
     cardinality = dataset.cardinality().numpy()
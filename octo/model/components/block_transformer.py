@@ -1,6 +1,7 @@
 # Written by Dibya
 from enum import Enum
 from fnmatch import fnmatch
+from functools import lru_cache
 import logging
 from typing import Any, Dict, Mapping, Sequence, Tuple, Union
 
@@ -67,6 +68,12 @@ class TimestepGroup(TokenGroup):
         ), "TimestepGroup mask must be (batch, horizon, n_tokens)"
 
 
+@lru_cache(maxsize=None)
+def _warn_once(message: str):
+    """Logs a warning the first time it is seen, instead of once per forward trace."""
+    logging.warning(message)
+
+
 def find_match(pattern_dict: Dict[str, Any], name: str, default: Any) -> Any:
     """Find the first matching pattern in the dictionary, or return the default value."""
     for pattern, value in pattern_dict.items():
@@ -113,13 +120,118 @@ class TokenMetadata:
             raise ValueError(f"Invalid attention rule: {attention_rule}")
 
 
-def split_tokens(ary: jax.Array, n_tokens_per_group: Sequence[int], axis: int):
-    cumsum = np.cumsum(n_tokens_per_group)
-    return jnp.split(ary, cumsum, axis=axis)
+def _group_signature(group: Union[PrefixGroup, TimestepGroup], n_tokens: int) -> Tuple:
+    """Hashable summary of the group fields that determine the static attention mask."""
+    return (group.name, n_tokens, tuple(group.attention_rules.items()))
+
+
+@lru_cache(maxsize=None)
+def _attention_rule_codes(rule_signatures: Tuple) -> np.ndarray:
+    """Resolves the attention rule for every (attending group, attended-to group) pair
+    into an integer-coded (n_groups, n_groups) matrix. Cached so the fnmatch-based rule
+    resolution runs once per group configuration rather than once per pair per call.
+    The codes index into AttentionRule in declaration order.
+    """
+    group_names = [name for name, _ in rule_signatures]
+    rule_codes = {rule: code for code, rule in enumerate(AttentionRule)}
+    return np.array(
+        [
+            [
+                rule_codes[find_match(dict(rules), other_name, AttentionRule.NEVER)]
+                for other_name in group_names
+            ]
+            for _, rules in rule_signatures
+        ]
+    )
+
+
+@lru_cache(maxsize=None)
+def _static_attention_mask(
+    prefix_group_signatures: Tuple,
+    timestep_group_signatures: Tuple,
+    horizon: int,
+    side: str,
+) -> np.ndarray:
+    """Builds the (total_tokens, total_tokens) attention mask implied by the group
+    attention rules. The mask only depends on the group names, token counts, rules, and
+    horizon -- all static across training steps -- so the result is cached and reused
+    (and constant-folded by XLA) instead of being rebuilt on every forward pass.
+    """
+    tokens_per_prefix_group = [n for _, n, _ in prefix_group_signatures]
+    tokens_per_timestep_group = [n for _, n, _ in timestep_group_signatures]
+
+    tokens_for_prefix = sum(tokens_per_prefix_group)
+    tokens_per_time_step = sum(tokens_per_timestep_group)
+
+    # Map every token to the index of the group it belongs to (prefix groups
+    # first, then timestep groups) and to its timestep (-1 for prefix tokens).
+    if side == "right":
+        # direct token -> group lookup table
+        prefix_group_ids = np.repeat(
+            np.arange(len(tokens_per_prefix_group)), tokens_per_prefix_group
+        )
+        timestep_group_ids = len(prefix_group_signatures) + np.repeat(
+            np.arange(len(tokens_per_timestep_group)), tokens_per_timestep_group
+        )
+    else:
+        # the legacy December-release models assigned boundary tokens to the
+        # previous group (searchsorted with side="left"); keep that behavior
+        prefix_group_ids = np.searchsorted(
+            np.cumsum(tokens_per_prefix_group),
+            np.arange(tokens_for_prefix),
+            side=side,
+        )
+        timestep_group_ids = len(prefix_group_signatures) + np.searchsorted(
+            np.cumsum(tokens_per_timestep_group),
+            np.arange(tokens_per_time_step),
+            side=side,
+        )
+    group_ids = np.concatenate([prefix_group_ids, np.tile(timestep_group_ids, horizon)])
+    timesteps = np.concatenate(
+        [
+            np.full(tokens_for_prefix, -1),
+            np.repeat(np.arange(horizon), tokens_per_time_step),
+        ]
+    )
+
+    # Gather the per-group-pair attention rules up to the token level and evaluate
+    # them with broadcasted timestep comparisons instead of a python loop over all
+    # (total_tokens, total_tokens) pairs.
+    rule_codes = {rule: code for code, rule in enumerate(AttentionRule)}
+    group_rules = _attention_rule_codes(
+        tuple(
+            (name, rules)
+            for name, _, rules in prefix_group_signatures + timestep_group_signatures
+        )
+    )
+    token_rules = group_rules[group_ids[:, None], group_ids[None, :]]
+    attending, attended = timesteps[:, None], timesteps[None, :]
+    return np.select(
+        [
+            token_rules == rule_codes[AttentionRule.CAUSAL],
+            token_rules == rule_codes[AttentionRule.CURRENT],
+            token_rules == rule_codes[AttentionRule.STRICT_PAST],
+            token_rules == rule_codes[AttentionRule.ALL],
+        ],
+        [
+            attended <= attending,
+            attended == attending,
+            attended < attending,
+            True,
+        ],
+        default=False,
+    )
 
 
 class BlockTransformer(nn.Module):
-    """A transformer that acts on multiple groups of tokens, which may attend to each other (in complex patterns)."""
+    """A transformer that acts on multiple groups of tokens, which may attend to each other (in complex patterns).
+
+    Note on specialization: this module always runs inside the caller's jax.jit, where
+    group counts, token counts, and horizon are static python values during tracing.
+    Everything derived from them (attention rule matrix, static attention mask, token
+    offsets) is computed in cached numpy helpers and baked into the compiled step as
+    constants, so no per-step python or HLO work depends on the group structure.
+    """
 
     # Forwarded to Transformer
     transformer_kwargs: Dict
@@ -159,11 +271,15 @@ class BlockTransformer(nn.Module):
             self.pretty_print_attention_mask(prefix_groups, timestep_groups)
 
         horizon = timestep_groups[0].tokens.shape[1]
-        assert all([group.tokens.shape[1] == horizon for group in timestep_groups])
+        assert len({group.tokens.shape[1] for group in timestep_groups}) == 1
 
-        token_dim = timestep_groups[0].tokens.shape[-1]
-        assert all([group.tokens.shape[-1] == token_dim for group in prefix_groups])
-        assert all([group.tokens.shape[-1] == token_dim for group in timestep_groups])
+        assert (
+            len(
+                {group.tokens.shape[-1] for group in prefix_groups}
+                | {group.tokens.shape[-1] for group in timestep_groups}
+            )
+            == 1
+        )
 
         # Assemble input tokens (batch, total_tokens, token_embedding_size)
         input_tokens = self.assemble_input_tokens(prefix_groups, timestep_groups)
@@ -200,27 +316,29 @@ class BlockTransformer(nn.Module):
         Returns:
             tokens: A tensor of shape (batch, total_tokens, token_embedding_size)
         """
-        if len(prefix_groups) > 0:
-            all_prefix_tokens = jnp.concatenate(
-                [group.tokens for group in prefix_groups], axis=1
-            )
+        # skip the concat pass entirely when there is only one group to "concatenate"
+        if len(timestep_groups) == 1:
+            all_timestep_tokens = timestep_groups[0].tokens
         else:
-            all_prefix_tokens = jnp.zeros(
-                (
-                    timestep_groups[0].tokens.shape[0],
-                    0,
-                    timestep_groups[0].tokens.shape[-1],
-                ),
-                dtype=jnp.float32,
+            all_timestep_tokens = jnp.concatenate(
+                [group.tokens for group in timestep_groups], axis=2
             )
-
-        all_timestep_tokens = jnp.concatenate(
-            [group.tokens for group in timestep_groups], axis=2
-        )
-        all_timestep_tokens = einops.rearrange(
-            all_timestep_tokens,
-            "batch horizon n_tokens d -> batch (horizon n_tokens) d",
+        # after the axis=2 concat the (horizon, n_tokens) axes are contiguous, so
+        # folding them is a pure reshape (no data movement)
+        batch_size, horizon, n_tokens, token_dim = all_timestep_tokens.shape
+        all_timestep_tokens = jnp.reshape(
+            all_timestep_tokens, (batch_size, horizon * n_tokens, token_dim)
         )
+
+        if len(prefix_groups) == 0:
+            return all_timestep_tokens
+
+        if len(prefix_groups) == 1:
+            all_prefix_tokens = prefix_groups[0].tokens
+        else:
+            all_prefix_tokens = jnp.concatenate(
+                [group.tokens for group in prefix_groups], axis=1
+            )
         tokens = jnp.concatenate([all_prefix_tokens, all_timestep_tokens], axis=1)
         return tokens
 
@@ -232,41 +350,34 @@ class BlockTransformer(nn.Module):
     ):
         """Reverses the process of assemble_input_tokens."""
 
+        batch_size, _, token_dim = output_tokens.shape
         horizon = timestep_groups[0].tokens.shape[1]
         tokens_per_prefix_group = [group.tokens.shape[1] for group in prefix_groups]
         n_prefix_tokens = sum(tokens_per_prefix_group)
 
-        prefix_embeddings, timestep_embeddings = jnp.split(
-            output_tokens, [n_prefix_tokens], axis=1
-        )
-
-        # Process prefix group outputs
-        if len(prefix_groups) > 0:
-            prefix_embeddings_split = split_tokens(
-                prefix_embeddings, tokens_per_prefix_group, axis=1
+        # Slice with static python offsets instead of jnp.split: fewer HLO ops in the
+        # trace, identical result.
+        prefix_offsets = np.cumsum([0] + tokens_per_prefix_group)
+        all_prefix_outputs = [
+            group.replace(tokens=output_tokens[:, start:stop])
+            for group, start, stop in zip(
+                prefix_groups, prefix_offsets[:-1], prefix_offsets[1:]
             )
-            all_prefix_outputs = [
-                group.replace(tokens=embeddings)
-                for group, embeddings in zip(prefix_groups, prefix_embeddings_split)
-            ]
-        else:
-            all_prefix_outputs = []
+        ]
 
-        # Process timestep group outputs
-        timestep_embeddings = einops.rearrange(
-            timestep_embeddings,
-            "batch (horizon n_tokens) d -> batch horizon n_tokens d",
-            horizon=horizon,
+        # Process timestep group outputs: unfold the horizon dim, then slice out each
+        # group along the token axis.
+        timestep_embeddings = jnp.reshape(
+            output_tokens[:, n_prefix_tokens:],
+            (batch_size, horizon, -1, token_dim),
         )
-
         tokens_per_timestep_group = [group.tokens.shape[2] for group in timestep_groups]
-        timestep_embeddings_split = split_tokens(
-            timestep_embeddings, tokens_per_timestep_group, axis=2
-        )
-
+        timestep_offsets = np.cumsum([0] + tokens_per_timestep_group)
         all_timestep_outputs = [
-            group.replace(tokens=embeddings)
-            for group, embeddings in zip(timestep_groups, timestep_embeddings_split)
+            group.replace(tokens=timestep_embeddings[:, :, start:stop])
+            for group, start, stop in zip(
+                timestep_groups, timestep_offsets[:-1], timestep_offsets[1:]
+            )
         ]
         return all_prefix_outputs, all_timestep_outputs
 
@@ -292,42 +403,24 @@ class BlockTransformer(nn.Module):
 
         if not self.use_correct_attention:
             # No longer used in new models, but keeping for backward compatibility w/ models released in DEcember
-            logging.warning(
-                "Using old attention computation from released December models."
-            )
+            _warn_once("Using old attention computation from released December models.")
             side = "left"
         else:
             side = "right"
 
-        def _get_position(i, tokens_per_elem):
-            return np.searchsorted(np.cumsum(tokens_per_elem), i, side=side)
-
         horizon = timestep_groups[0].tokens.shape[1]
-        tokens_per_prefix_group = [group.tokens.shape[1] for group in prefix_groups]
-        tokens_per_timestep_group = [group.tokens.shape[2] for group in timestep_groups]
-
-        tokens_for_prefix = sum(tokens_per_prefix_group)
-        tokens_per_time_step = sum(tokens_per_timestep_group)
-
-        total_tokens = tokens_for_prefix + tokens_per_time_step * horizon
-        attention_mask = np.zeros((total_tokens, total_tokens), dtype=int)
-
-        def get_token_metadata(i):
-            if i < tokens_for_prefix:
-                position = _get_position(i, tokens_per_prefix_group)
-                return TokenMetadata.create(prefix_groups[position], timestep=-1)
-
-            i -= tokens_for_prefix
-            timestep, i = divmod(i, tokens_per_time_step)
-            position = _get_position(i, tokens_per_timestep_group)
-            return TokenMetadata.create(timestep_groups[position], timestep)
-
-        for i in range(total_tokens):  # Token attending
-            for j in range(total_tokens):  # Token being attended to
-                metadata_i = get_token_metadata(i)
-                metadata_j = get_token_metadata(j)
-                mask = int(metadata_i.should_attend_to(metadata_j))
-                attention_mask[i, j] = mask
+        attention_mask = _static_attention_mask(
+            tuple(
+                _group_signature(group, group.tokens.shape[1])
+                for group in prefix_groups
+            ),
+            tuple(
+                _group_signature(group, group.tokens.shape[2])
+                for group in timestep_groups
+            ),
+            horizon,
+            side,
+        )
 
         pad_attention_mask = self.generate_pad_attention_mask(
             prefix_groups, timestep_groups
@@ -343,34 +436,33 @@ class BlockTransformer(nn.Module):
         """
         Generate a nn.MultiHeadDotProductAttention mask that ignores padding by masks from all timestep groups,
         unfold the horizon dim, and concatenate with all the prefix group masks.
-        We broadcast this (batch, total_tokens) mask to the requisite (batch, 1, total_tokens, total_tokens).
+        We return the mask as (batch, 1, 1, total_tokens) and let XLA broadcast it
+        against the (total_tokens, total_tokens) rule mask and the attention weights,
+        instead of materializing the full (batch, 1, total_tokens, total_tokens) tensor.
         """
         batch_size, horizon = timestep_groups[0].tokens.shape[:2]
-        if len(prefix_groups) > 0:
+        if len(prefix_groups) == 1:
+            prefix_pad_mask = prefix_groups[0].mask
+        elif len(prefix_groups) > 0:
             prefix_pad_mask = jnp.concatenate(
                 [group.mask for group in prefix_groups], axis=1
             )
         else:
             prefix_pad_mask = jnp.zeros((batch_size, 0), dtype=jnp.bool_)
-        timestep_pad_mask = jnp.concatenate(
-            [group.mask for group in timestep_groups], axis=2
-        )
+        if len(timestep_groups) == 1:
+            timestep_pad_mask = timestep_groups[0].mask
+        else:
+            timestep_pad_mask = jnp.concatenate(
+                [group.mask for group in timestep_groups], axis=2
+            )
         timestep_pad_mask = einops.rearrange(
             timestep_pad_mask,
             "batch horizon n_tokens -> batch (horizon n_tokens)",
         )
         pad_mask = jnp.concatenate([prefix_pad_mask, timestep_pad_mask], axis=1)
-        # pad_mask has shape (batch, total_tokens)
-        pad_mask = jnp.broadcast_to(
-            pad_mask[:, None, None, :],
-            (
-                batch_size,
-                1,
-                pad_mask.shape[1],
-                pad_mask.shape[1],
-            ),
-        )
-        return pad_mask
+        # pad_mask has shape (batch, total_tokens); group masks may arrive as floats,
+        # but the mask is boolean by semantics -- store it as such (1 byte/element)
+        return pad_mask[:, None, None, :].astype(jnp.bool_)
 
     def verify_causality(
         self,
@@ -390,14 +482,15 @@ class BlockTransformer(nn.Module):
                 ), f"Causality broken! Prefix group {prefix_group.name} is attending to timestep group {ts_group.name}"
 
         # Next, make sure that nothing is attending to future timesteps
-        for group in prefix_groups + timestep_groups:
-            for other_group in prefix_groups + timestep_groups:
-                rule = find_match(
-                    group.attention_rules, other_group.name, AttentionRule.NEVER
-                )
-                assert (
-                    rule != AttentionRule.ALL
-                ), "Causality broken! WhenToAttend.ALL attends to future timesteps too."
+        rule_matrix = _attention_rule_codes(
+            tuple(
+                (group.name, tuple(group.attention_rules.items()))
+                for group in prefix_groups + timestep_groups
+            )
+        )
+        assert (
+            rule_matrix != list(AttentionRule).index(AttentionRule.ALL)
+        ).all(), "Causality broken! WhenToAttend.ALL attends to future timesteps too."
 
     def pretty_print_attention_mask(
         self,
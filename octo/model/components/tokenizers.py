@@ -1,3 +1,4 @@
+from functools import lru_cache
 import logging
 import re
 from typing import Dict, Optional, Sequence
@@ -6,12 +7,13 @@ import flax
 import flax.linen as nn
 import jax
 import jax.numpy as jnp
-from jax.scipy.stats import norm
 import numpy as np
+from scipy.stats import norm
 
 from octo.model.components.base import TokenGroup
 from octo.model.components.transformer import MAPHead
 from octo.utils.spec import ModuleSpec
+from octo.utils.typing import Dtype
 
 EPS = 1e-6
 
@@ -45,9 +47,12 @@ class TokenLearner(nn.Module):
         num_tokens (int): Number of output tokens.
         bottleneck_dim (int): Size of the hidden layers of the mapping MLP.
         dropout_rate (float): Rate of dropout applied in the mapping MLP. Defaults to no dropout.
+        dtype (Dtype): Activation dtype; set to jnp.bfloat16 to halve the bytes
+            moved through the pooling attention (params stay fp32).
     """
 
     num_tokens: int
+    dtype: Dtype = jnp.float32
 
     @nn.compact
     def __call__(self, inputs, train: bool = True):
@@ -56,17 +61,31 @@ class TokenLearner(nn.Module):
             nn.initializers.normal(stddev=0.02),
             (inputs.shape[-2], inputs.shape[-1]),
         )
-        x = inputs + jnp.broadcast_to(pos_embed, inputs.shape)
-        x = nn.LayerNorm()(x)
-        return MAPHead(num_readouts=self.num_tokens)(x, train=train)
+        # (l, d) broadcasts against (..., l, d) implicitly; no need to spell it out
+        x = inputs + pos_embed
+        x = nn.LayerNorm(dtype=self.dtype)(x)
+        out = MAPHead(num_readouts=self.num_tokens, dtype=self.dtype)(x, train=train)
+        return out.astype(inputs.dtype)
+
+
+@lru_cache(maxsize=None)
+def _compile_regex(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
 
 
 def regex_match(regex_keys, x):
-    return any([re.match(r_key, x) for r_key in regex_keys])
+    return any(_compile_regex(r_key).match(x) for r_key in regex_keys)
+
+
+@lru_cache(maxsize=None)
+def _regex_filter_cached(regex_keys, xs):
+    return tuple(x for x in xs if regex_match(regex_keys, x))
 
 
 def regex_filter(regex_keys, xs):
-    return list(filter(lambda x: regex_match(regex_keys, x), xs))
+    # key resolution is pure string work that would otherwise rerun on every
+    # trace; both arguments are small and hashable, so cache the result
+    return list(_regex_filter_cached(tuple(regex_keys), tuple(xs)))
 
 
 class ImageTokenizer(nn.Module):
@@ -103,6 +122,9 @@ class ImageTokenizer(nn.Module):
                 if check_spatial:
                     assert len(inputs[key].shape) >= 4
                 extracted_outputs.append(inputs[key])
+            if len(extracted_outputs) == 1:
+                # common case of a single matching key: no concat, no copy
+                return extracted_outputs[0]
             return jnp.concatenate(extracted_outputs, axis=-1)
 
         obs_stack_keys = regex_filter(self.obs_stack_keys, sorted(observations.keys()))
@@ -133,16 +155,28 @@ class ImageTokenizer(nn.Module):
                     f"No task inputs matching {self.task_stack_keys} were found."
                 )
             task_inputs = extract_inputs(task_stack_keys, tasks, check_spatial=True)
-            task_inputs = task_inputs[:, None].repeat(enc_inputs.shape[1], axis=1)
+            # task images are identical across time; broadcast them as a view and let
+            # the concatenate below do the single real write
+            task_inputs = jnp.broadcast_to(
+                task_inputs[:, None],
+                (task_inputs.shape[0], enc_inputs.shape[1], *task_inputs.shape[1:]),
+            )
             enc_inputs = jnp.concatenate([enc_inputs, task_inputs], axis=-1)
         b, t, h, w, c = enc_inputs.shape
+        # inputs are stacked along the trailing channel axis, so flattening the two
+        # leading axes is a metadata-only reshape in row-major layout
         enc_inputs = jnp.reshape(enc_inputs, (b * t, h, w, c))
 
         # extract non-spatial FiLM inputs
         encoder_input_kwargs = {}
         if self.task_film_keys:
             film_inputs = extract_inputs(self.task_film_keys, tasks)
-            film_inputs = film_inputs[:, None].repeat(t, axis=1)
+            # replicate across the time axis as a broadcast view; only the final
+            # reshape to (b * t, -1) touches memory, and XLA can fuse even that into
+            # the FiLM conditioning that consumes it
+            film_inputs = jnp.broadcast_to(
+                film_inputs[:, None], (b, t, film_inputs.shape[-1])
+            )
             encoder_input_kwargs.update(
                 {"cond_var": jnp.reshape(film_inputs, (b * t, -1))}
             )
@@ -176,6 +210,11 @@ class LanguageTokenizer(nn.Module):
          num_tokens (int): Number of output tokens (not enforced).
          encoder (str, optional): Optional HuggingFace AutoModel name for encoding input IDs.
          finetune_encoder (bool, optional): Optional finetune last layers of the language model.
+
+     When the encoder is kept frozen (finetune_encoder=False), also add
+     `frozen_keys=("*hf_model*",)` to the optimizer config (see
+     `octo_pretrain_config.py`) so its parameters are excluded from optimizer
+     state instead of just having their gradients stopped.
     """
 
     encoder: str = None
@@ -251,27 +290,38 @@ class BinTokenizer(nn.Module):
         if self.bin_type == "uniform":
             self.thresholds = jnp.linspace(self.low, self.high, self.n_bins + 1)
         elif self.bin_type == "normal":
-            self.thresholds = norm.ppf(jnp.linspace(EPS, 1 - EPS, self.n_bins + 1))
+            # quantiles depend only on n_bins, so compute them host-side in numpy;
+            # they enter the graph as a single constant instead of an erfinv op chain
+            self.thresholds = jnp.asarray(
+                norm.ppf(np.linspace(EPS, 1 - EPS, self.n_bins + 1)),
+                dtype=jnp.float32,
+            )
         else:
             raise ValueError(
                 f"Binning type {self.bin_type} not supported in BinTokenizer."
             )
+        self.bin_avgs = (self.thresholds[:-1] + self.thresholds[1:]) / 2
 
     def __call__(self, inputs):
         if self.bin_type == "uniform":
+            # uniform bins are an affine map: a single multiply-floor-clip per
+            # element, no threshold table search needed
             inputs = jnp.clip(inputs, self.low + EPS, self.high - EPS)
-        inputs = inputs[..., None]
-        token_one_hot = (inputs < self.thresholds[1:]) & (
-            inputs >= self.thresholds[:-1]
-        ).astype(jnp.uint8)
-        output_tokens = jnp.argmax(token_one_hot, axis=-1)
-        return output_tokens
+            return jnp.clip(
+                jnp.floor((inputs - self.low) / (self.high - self.low) * self.n_bins),
+                0,
+                self.n_bins - 1,
+            ).astype(jnp.int32)
+        # bucketize directly: token k covers [thresholds[k], thresholds[k+1]). This
+        # avoids materializing a (..., n_bins) one-hot and argmaxing over it.
+        return jnp.searchsorted(self.thresholds[1:-1], inputs, side="right").astype(
+            jnp.int32
+        )
 
     def decode(self, inputs):
-        one_hot = jax.nn.one_hot(inputs, self.n_bins)
-        bin_avgs = (self.thresholds[1:] + self.thresholds[:-1]) / 2
-        outputs = jnp.sum(one_hot * bin_avgs, axis=-1)
-        return outputs
+        # a token is decoded to the center of its bin; a gather on the precomputed
+        # centers replaces the (..., n_bins) one-hot multiply-reduce
+        return self.bin_avgs[inputs]
 
 
 class LowdimObsTokenizer(BinTokenizer):
@@ -299,7 +349,7 @@ class LowdimObsTokenizer(BinTokenizer):
 
         tokenizer_inputs = []
         for o_key in self.obs_keys:
-            for key in filter(re.compile(o_key).match, sorted(observations.keys())):
+            for key in filter(_compile_regex(o_key).match, sorted(observations.keys())):
                 assert (
                     len(observations[key].shape) == 3
                 ), f"Only supports non-spatial inputs but {key} has shape {observations[key].shape}."
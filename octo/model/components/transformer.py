@@ -82,6 +82,9 @@ class MAPHead(nn.Module):
     mlp_dim: Optional[int] = None  # Defaults to 4x input dim
     num_heads: int = 8
     num_readouts: int = 1
+    # activation dtype; params stay fp32 regardless (Flax's param_dtype default),
+    # so bf16 here halves bandwidth without touching checkpoint numerics
+    dtype: Dtype = jnp.float32
 
     @nn.compact
     def __call__(self, x: Union[jax.Array, TokenGroup], train=True):
@@ -91,7 +94,11 @@ class MAPHead(nn.Module):
             mask = None
 
         *batch_dims, l, d = x.shape
-        x = x.reshape(-1, l, d)
+        # shapes are static at trace time, so skip the flatten/unflatten pair
+        # entirely when the input is already 3D
+        needs_flatten = len(batch_dims) != 1
+        if needs_flatten:
+            x = x.reshape(-1, l, d)
         batch_size = x.shape[0]
 
         probe = self.param(
@@ -100,25 +107,31 @@ class MAPHead(nn.Module):
             (1, self.num_readouts, d),
             x.dtype,
         )
-        probe = jnp.tile(probe, [batch_size, 1, 1])
+        # broadcast instead of tile: XLA folds the (strided) view into the attention
+        # matmul without materializing a batch of identical probes
+        probe = jnp.broadcast_to(probe, (batch_size, self.num_readouts, d))
 
         if mask is not None:
-            mask = mask.reshape(-1, l)
+            if needs_flatten:
+                mask = mask.reshape(-1, l)
             mask = jnp.broadcast_to(
                 mask[:, None, None, :], (batch_size, 1, self.num_readouts, l)
             )
 
         out = nn.MultiHeadDotProductAttention(
-            num_heads=self.num_heads, kernel_init=nn.initializers.xavier_uniform()
+            num_heads=self.num_heads,
+            dtype=self.dtype,
+            kernel_init=nn.initializers.xavier_uniform(),
         )(probe, x, mask=mask)
 
         # TODO: dropout on head?
-        y = nn.LayerNorm()(out)
+        y = nn.LayerNorm(dtype=self.dtype)(out)
 
-        out = out + MlpBlock(mlp_dim=nn.merge_param("mlp_dim", self.mlp_dim, 4 * d))(
-            y, deterministic=not train
-        )
-        out = out.reshape(*batch_dims, self.num_readouts, d)
+        out = out + MlpBlock(
+            mlp_dim=nn.merge_param("mlp_dim", self.mlp_dim, 4 * d), dtype=self.dtype
+        )(y, deterministic=not train)
+        if needs_flatten:
+            out = out.reshape(*batch_dims, self.num_readouts, d)
         return out
 
 
@@ -1,6 +1,8 @@
+import collections
+import itertools
 import logging
 import os
-from typing import Any, Optional, Sequence
+from typing import Any, Iterator, Optional, Sequence
 
 import jax
 from jax.experimental import multihost_utils
@@ -70,6 +72,29 @@ def replicate(x: Any, devices: Optional[Sequence[jax.Device]] = None) -> jax.Arr
     )
 
 
+def prefetch_to_device(iterator: Iterator[Any], size: int = 2) -> Iterator[Any]:
+    """Keeps `size` batches from a host-side iterator in flight on device, so the
+    (asynchronous) host-to-device copy of upcoming batches overlaps with compute on
+    the current step. Leaves that are already jax.Arrays (e.g. global arrays produced
+    by merge_along_axis) are passed through; host arrays are moved with
+    jax.device_put."""
+    queue = collections.deque()
+
+    def _enqueue(n: int):
+        for batch in itertools.islice(iterator, n):
+            queue.append(
+                jax.tree_map(
+                    lambda x: x if isinstance(x, jax.Array) else jax.device_put(x),
+                    batch,
+                )
+            )
+
+    _enqueue(size)
+    while queue:
+        yield queue.popleft()
+        _enqueue(1)
+
+
 def initialize_compilation_cache(
     cache_dir=os.path.expanduser("~/.jax_compilation_cache"),
 ):
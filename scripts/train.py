@@ -163,6 +163,9 @@ def main(_):
             train_data.iterator(prefetch=FLAGS.config.prefetch_num_batches),
         ),
     )
+    # keep a couple of sharded batches in flight so the host-to-device copy of the
+    # next batch overlaps with the current train step
+    train_data_iter = jax_utils.prefetch_to_device(train_data_iter, size=2)
 
     example_batch = next(train_data_iter)
     logging.info(f"Batch size: {example_batch['action'].shape[0]}")